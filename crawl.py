@@ -1,23 +1,38 @@
 #!/usr/bin/env python3
-import requests
-from typing import Final, List, Dict, Any, Optional, Tuple, Union
-import tqdm
-import concurrent.futures
+import httpx
+import asyncio
+from typing import Final, List, Dict, Any, Optional, Tuple, Callable
+import tqdm.asyncio
 import json
-import csv
+import io
 import argparse
+import cbor2
+import shelve
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+# Fast JSON parser when orjson is installed, stdlib fallback otherwise
+json_loads = orjson.loads if orjson is not None else json.loads
 
 # Strong type definitions
 HeadersType = Dict[str, str]
 QuestionDataType = Dict[str, Any]
 QuestionsDict = Dict[str, Dict[str, Any]]
-ExternalIdTaskResult = Tuple[str, Dict[str, Any]]
-IBNTaskResult = Optional[requests.Response]
+DetailTaskResult = Tuple[str, Optional[Dict[str, Any]]]
 
 headers: Final[HeadersType] = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:138.0) Gecko/20100101 Firefox/138.0",
     "Accept": "application/json, text/plain, */*",
     "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate, br",
     "Content-Type": "application/json",
     "Origin": "https://satsuitequestionbank.collegeboard.org",
     "Connection": "keep-alive",
@@ -27,198 +42,303 @@ headers: Final[HeadersType] = {
     "Sec-Fetch-Site": "same-site",
 }
 
-# Create a global session object
-session: requests.Session = requests.Session()
-session.headers.update(headers)
+# Bound on simultaneously in-flight detail requests
+MAX_CONCURRENT_REQUESTS: Final[int] = 64
 
+# On-disk cache of fetched details so re-runs skip completed requests
+DETAILS_CACHE_PATH: Final[str] = "details_cache"
 
-def get_question_details(external_id: str) -> ExternalIdTaskResult:
-    """Get detailed information for a single question"""
-    response: requests.Response = session.post(
-        "https://qbank-api.collegeboard.org/msreportingquestionbank-prod/questionbank/digital/get-question",
-        json={"external_id": external_id},
+# Retry policy for transient failures
+RETRY_TOTAL: Final[int] = 3
+RETRY_BACKOFF: Final[float] = 0.3
+RETRY_STATUSES: Final[frozenset] = frozenset({429, 500, 502, 503, 504})
+
+
+def make_client() -> httpx.AsyncClient:
+    """Create the shared HTTP client; HTTP/2 multiplexes every request
+    over a handful of connections, so TLS is negotiated only once each"""
+    return httpx.AsyncClient(
+        http2=True,
+        headers=headers,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        timeout=30.0,
     )
-    return external_id, response.json()
 
 
-def get_question_details_ibn(ibn: str) -> IBNTaskResult:
-    """Get detailed information for ibn type questions"""
-    if ibn:
-        response: requests.Response = session.get(
-            f"https://saic.collegeboard.org/disclosed/{ibn}.json"
+async def fetch_json(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+) -> Tuple[int, Any]:
+    """Issue a request and parse the JSON body, retrying transient failures"""
+    for attempt in range(RETRY_TOTAL + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+                continue
+            if response.status_code != 200:
+                return response.status_code, None
+            return response.status_code, json_loads(response.content)
+        except httpx.HTTPError:
+            if attempt >= RETRY_TOTAL:
+                raise
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+    raise RuntimeError("unreachable")
+
+
+async def get_question_details(
+    client: httpx.AsyncClient, semaphore: asyncio.Semaphore, external_id: str
+) -> DetailTaskResult:
+    """Get detailed information for a single question"""
+    async with semaphore:
+        _, details = await fetch_json(
+            client,
+            "POST",
+            "https://qbank-api.collegeboard.org/msreportingquestionbank-prod/questionbank/digital/get-question",
+            json={"external_id": external_id},
         )
-        return response
-    return None
+        return external_id, details
 
 
-def process_data(data: List[QuestionDataType], debug: bool = False) -> QuestionsDict:
-    """Process data in parallel"""
+async def get_question_details_ibn(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    ibn: str,
+    log: Callable[[str], None] = print,
+) -> DetailTaskResult:
+    """Get detailed information for ibn type questions"""
+    async with semaphore:
+        status, details = await fetch_json(
+            client, "GET", f"https://saic.collegeboard.org/disclosed/{ibn}.json"
+        )
+        if details is None:
+            log(f"Failed to fetch ibn details for {ibn} (status {status})")
+        return ibn, details
+
+
+async def process_data(
+    client: httpx.AsyncClient,
+    cache: shelve.Shelf,
+    data: List[QuestionDataType],
+    debug: bool = False,
+    log: Callable[[str], None] = print,
+) -> QuestionsDict:
+    """Process data concurrently"""
     # If in debug mode, only process the first 100 questions
     if debug:
         data = data[:100]
-        print(f"Debug mode: Processing only {len(data)} questions")
-
-    # Collect two types of tasks separately
-    external_id_tasks: List[str] = []
-    ibn_tasks: List[str] = []
+        log(f"Debug mode: Processing only {len(data)} questions")
+
+    # Single pass over the feed: build the question entries up front and
+    # remember which entries each (deduplicated) detail id has to fill.
+    # dict.fromkeys pre-sizes the table so the build loop assigns into
+    # existing slots instead of triggering incremental resizes
+    questions_dict: QuestionsDict = dict.fromkeys(
+        item["questionId"] for item in data if item.get("questionId")
+    )  # type: ignore[assignment]
+    pending: Dict[str, List[Dict[str, Any]]] = {}
+    external_id_tasks: set[str] = set()
+    ibn_tasks: set[str] = set()
 
     for item in data:
         ibn: Optional[str] = item.get("ibn")
         external_id: Optional[str] = item.get("external_id")
-
-        if (ibn is None or ibn == "") and external_id:
-            external_id_tasks.append(external_id)
-        elif ibn and ibn != "":
-            ibn_tasks.append(ibn)
-
-    details_dict: Dict[str, Dict[str, Any]] = {}
-    questions_dict: QuestionsDict = {}
-
-    # Use thread pool to fetch details in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        futures: Dict[concurrent.futures.Future[Any], Tuple[str, str]] = {}
-
-        # Submit external_id tasks
-        for external_id in external_id_tasks:
-            future: concurrent.futures.Future[ExternalIdTaskResult] = executor.submit(get_question_details, external_id)
-            futures[future] = ("external_id", external_id)
-
-        # Submit ibn tasks
-        for ibn in ibn_tasks:
-            future_ibn: concurrent.futures.Future[IBNTaskResult] = executor.submit(get_question_details_ibn, ibn)
-            futures[future_ibn] = ("ibn", ibn)
-
-        # Show progress bar
-        for future in tqdm.tqdm(
-            concurrent.futures.as_completed(futures),
-            total=len(futures),
-            desc="Fetching details",
-        ):
-            try:
-                task_type: str
-                task_id: str
-                task_type, task_id = futures[future]
-
-                if task_type == "external_id":
-                    result: ExternalIdTaskResult = future.result()
-                    external_id_result: str
-                    details: Dict[str, Any]
-                    external_id_result, details = result
-                    details_dict[external_id_result] = details
-                elif task_type == "ibn":
-                    response: Union[IBNTaskResult, Any] = future.result()
-                    if response and response.status_code == 200:
-                        details_dict[task_id] = response.json()
-                    else:
-                        print(f"Failed to fetch ibn details for {task_id}")
-
-            except Exception as e:
-                print(f"Error fetching details for {futures[future]}: {e}")
-
-    # Process all questions - simple merge of raw JSON
-    for item in data:
-        external_id: Optional[str] = item.get("external_id")
-        ibn: Optional[str] = item.get("ibn")
         question_id: Optional[str] = item.get("questionId")
 
-        if not question_id:
-            continue
-
         # Create complete question data
         full_question: Dict[str, Any] = {
             "basic_info": item,  # Raw basic information
             "details": None      # Detailed information
         }
+        if question_id:
+            questions_dict[question_id] = full_question
 
-        # Get corresponding details based on type
-        if (ibn is None or len(ibn) == 0) and external_id:
-            full_question["details"] = details_dict.get(external_id)
-        elif ibn:
-            full_question["details"] = details_dict.get(ibn)
-
-        questions_dict[question_id] = full_question
+        if (ibn is None or ibn == "") and external_id:
+            external_id_tasks.add(external_id)
+            pending.setdefault(external_id, []).append(full_question)
+        elif ibn and ibn != "":
+            ibn_tasks.add(ibn)
+            pending.setdefault(ibn, []).append(full_question)
+
+    # Fetch details concurrently, bounded by the semaphore; ids already in
+    # the on-disk cache are served from there so re-runs skip the network
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    cache_keys: Dict[str, str] = {}
+    coros = []
+    for external_id in external_id_tasks:
+        key = f"external_id:{external_id}"
+        if key in cache:
+            details = cache[key]
+            for full_question in pending[external_id]:
+                full_question["details"] = details
+        else:
+            cache_keys[external_id] = key
+            coros.append(get_question_details(client, semaphore, external_id))
+    for ibn in ibn_tasks:
+        key = f"ibn:{ibn}"
+        if key in cache:
+            details = cache[key]
+            for full_question in pending[ibn]:
+                full_question["details"] = details
+        else:
+            cache_keys[ibn] = key
+            coros.append(get_question_details_ibn(client, semaphore, ibn, log))
+
+    # Show progress bar; results land straight in the question entries.
+    # Hoist the hot lookups to locals and redraw the bar sparingly so
+    # the loop itself stays cheap when responses arrive quickly
+    pending_get = pending.get
+    cache_keys_get = cache_keys.__getitem__
+    cache_set = cache.__setitem__
+    for future in tqdm.asyncio.tqdm.as_completed(
+        coros,
+        total=len(coros),
+        desc="Fetching details",
+        mininterval=0.5,
+        smoothing=0.05,
+    ):
+        try:
+            task_id: str
+            task_id, details = await future
+            if details is not None:
+                for full_question in pending_get(task_id, ()):
+                    full_question["details"] = details
+                cache_set(cache_keys_get(task_id), details)
+        except Exception as e:
+            log(f"Error fetching details: {e}")
 
     return questions_dict
 
 
-def main(debug: bool = False) -> None:
-    """Main function"""
-    # Get reading section questions
-    print("Fetching reading questions...")
-    response: requests.Response = session.post(
+def csv_quote(value: Optional[str]) -> str:
+    """Quote a free-text CSV field"""
+    return '"' + (value or "").replace('"', '""') + '"'
+
+
+def save_csv(filename: str, questions: QuestionsDict) -> None:
+    """Save one section's question summary as CSV"""
+    # The four columns are simple enough that formatting rows directly is
+    # cheaper than the csv module's dialect machinery; only the free-text
+    # Domain/Skill columns need quoting
+    buf = io.StringIO()
+    buf.write("ID,Difficulty,Domain,Skill\n")
+    buf.writelines(
+        f'{basic_info.get("questionId") or ""},'
+        f'{basic_info.get("difficulty") or ""},'
+        f'{csv_quote(basic_info.get("primary_class_cd_desc"))},'
+        f'{csv_quote(basic_info.get("skill_desc"))}\n'
+        for question in questions.values()
+        for basic_info in (question["basic_info"],)
+    )
+    with open(filename, "w+", encoding="utf-8", newline="") as f:
+        f.write(buf.getvalue())
+
+
+async def fetch_and_process(
+    client: httpx.AsyncClient,
+    cache: shelve.Shelf,
+    section: str,
+    test: int,
+    domain: str,
+    debug: bool = False,
+    log: Callable[[str], None] = print,
+) -> QuestionsDict:
+    """Fetch one section's question list and all of its details"""
+    log(f"Fetching {section} questions...")
+    status, data = await fetch_json(
+        client,
+        "POST",
         "https://qbank-api.collegeboard.org/msreportingquestionbank-prod/questionbank/digital/get-questions",
         json={
             "asmtEventId": 99,
-            "test": 1,
-            "domain": "INI,CAS,EOI,SEC",
+            "test": test,
+            "domain": domain,
         },
     )
+    log(f"{section.capitalize()} API response status: {status}")
+    questions: QuestionsDict = await process_data(client, cache, data, debug, log)
 
-    print(f"Reading API response status: {response.status_code}")
-    data: List[QuestionDataType] = response.json()
-    questions_dict: QuestionsDict = process_data(data, debug)
-
-    print("Fetched reading questions, saving to CSV...")
-
-    # Save reading section CSV
+    # Write this section's CSV in a worker thread so the disk write
+    # overlaps the other section's network fetches
     filename_suffix: str = "_debug" if debug else ""
-    with open(f"reading{filename_suffix}.csv", "w+", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID", "Difficulty", "Domain", "Skill"])
-        for question in questions_dict.values():
-            basic_info = question["basic_info"]
-            writer.writerow(
-                [
-                    basic_info.get("questionId"),
-                    basic_info.get("difficulty"),
-                    basic_info.get("primary_class_cd_desc"),
-                    basic_info.get("skill_desc"),
-                ]
+    log(f"Fetched {section} questions, saving to CSV...")
+    await asyncio.to_thread(save_csv, f"{section}{filename_suffix}.csv", questions)
+    return questions
+
+
+async def main(
+    debug: bool = False,
+    json_output: bool = False,
+    zstd_output: bool = False,
+    log: Callable[[str], None] = print,
+) -> None:
+    """Main function.
+
+    Embedders can pass ``log`` to receive status lines directly instead of
+    capturing stdout.
+    """
+    # The two sections hit independent endpoints with disjoint data, so
+    # fetch them concurrently
+    async with make_client() as client:
+        with shelve.open(DETAILS_CACHE_PATH) as cache:
+            questions_dict: QuestionsDict
+            math_questions: QuestionsDict
+            questions_dict, math_questions = await asyncio.gather(
+                fetch_and_process(
+                    client, cache, "reading", 1, "INI,CAS,EOI,SEC", debug, log
+                ),
+                fetch_and_process(client, cache, "math", 2, "H,P,Q,S", debug, log),
             )
 
-    # Get math section questions
-    print("Fetching math questions...")
-    response = session.post(
-        "https://qbank-api.collegeboard.org/msreportingquestionbank-prod/questionbank/digital/get-questions",
-        json={
-            "asmtEventId": 99,
-            "test": 2,
-            "domain": "H,P,Q,S",
-        },
-    )
-
-    print(f"Math API response status: {response.status_code}")
-    data = response.json()
-    math_questions: QuestionsDict = process_data(data, debug)
-
     # Merge both sections
+    filename_suffix: str = "_debug" if debug else ""
     questions_dict.update(math_questions)
 
-    print("Fetched math questions, saving to CSV...")
-
-    # Save math section CSV
-    with open(f"math{filename_suffix}.csv", "w+", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["ID", "Difficulty", "Domain", "Skill"])
-        for question in math_questions.values():
-            basic_info = question["basic_info"]
-            writer.writerow(
-                [
-                    basic_info.get("questionId"),
-                    basic_info.get("difficulty"),
-                    basic_info.get("primary_class_cd_desc"),
-                    basic_info.get("skill_desc"),
-                ]
-            )
-
-    # Save all questions to JSON
-    print("Saving all questions to JSON...")
-    with open(f"questions{filename_suffix}.json", "w+", encoding="utf-8") as f:
-        json.dump(questions_dict, f, indent=4, ensure_ascii=False)
-
-    print(f"Saved questions to questions{filename_suffix}.json")
-    print(f"Total questions processed: {len(questions_dict)}")
-    print("Done!")
+    # Save all questions to CBOR (compact, no pretty-printer overhead)
+    log("Saving all questions to CBOR...")
+    with open(f"questions{filename_suffix}.cbor", "wb") as fb:
+        cbor2.dump(questions_dict, fb)
+    log(f"Saved questions to questions{filename_suffix}.cbor")
+
+    if json_output:
+        # Optional JSON for backward compatibility; written compact since it
+        # is machine-consumed (indent would force json's slow pure-Python
+        # encoder path). Pretty-print on demand with `python -m json.tool`.
+        log("Saving all questions to JSON...")
+        if orjson is not None:
+            with open(f"questions{filename_suffix}.json", "wb") as fb:
+                fb.write(
+                    orjson.dumps(questions_dict, option=orjson.OPT_NON_STR_KEYS)
+                )
+        else:
+            with open(f"questions{filename_suffix}.json", "w+", encoding="utf-8") as f:
+                json.dump(questions_dict, f, separators=(",", ":"))
+        log(f"Saved questions to questions{filename_suffix}.json")
+
+    if zstd_output:
+        # Zstd-compressed JSON for sharing/archiving; the field names and
+        # JSON syntax compress 5-10x at negligible CPU cost
+        if zstandard is None:
+            log("zstandard is not installed; skipping .json.zst output")
+        else:
+            log("Saving zstd-compressed JSON...")
+            compressor = zstandard.ZstdCompressor(level=3)
+            with open(f"questions{filename_suffix}.json.zst", "wb") as fb:
+                if orjson is not None:
+                    with compressor.stream_writer(fb) as writer:
+                        writer.write(
+                            orjson.dumps(
+                                questions_dict, option=orjson.OPT_NON_STR_KEYS
+                            )
+                        )
+                else:
+                    with io.TextIOWrapper(
+                        compressor.stream_writer(fb), encoding="utf-8"
+                    ) as tw:
+                        json.dump(questions_dict, tw, ensure_ascii=False)
+            log(f"Saved questions to questions{filename_suffix}.json.zst")
+
+    log(f"Total questions processed: {len(questions_dict)}")
+    log("Done!")
 
 
 if __name__ == "__main__":
@@ -228,6 +348,16 @@ if __name__ == "__main__":
         action="store_true",
         help="Debug mode: only fetch 100 questions per section"
     )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also write questions.json for external consumers"
+    )
+    parser.add_argument(
+        "--zstd",
+        action="store_true",
+        help="Also write zstd-compressed questions.json.zst"
+    )
 
     args = parser.parse_args()
-    main(debug=args.debug)
+    asyncio.run(main(debug=args.debug, json_output=args.json, zstd_output=args.zstd))
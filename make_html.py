@@ -1,36 +1,142 @@
 #!/usr/bin/env python3
-from typing import Any, Union, List, Dict, Optional
+from typing import Any, Union, List, Dict, Optional, Tuple, Callable
 import json
+import os
+import sys
+import mmap
 import argparse
+import re
+import functools
+import concurrent.futures
+import cbor2
 from make_module import make_module
-from string import Template
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+# Pre-compiled HTML fragment templates; binding .format once keeps the
+# literal parsing out of the per-question render loops
+QUESTION_HEADER_FMT = (
+    '<div class="question"><div class="question-header">Question {0}</div>'
+).format
+STIMULUS_FMT = '<div class="stimulus">{0}</div>'.format
+STEM_FMT = '<div class="stem">{0}</div>'.format
+OPTION_LI_FMT = (
+    '<li class="option"><span class="option-letter">{0}</span>'
+    '<span class="option-content">{1}</span></li>'
+).format
+ANSWER_KEY_FMT = (
+    '<div class="answer-key"><strong>Correct Answer: {0}</strong></div>'
+).format
+RATIONALE_FMT = (
+    '<div class="rationale"><strong>Explanation:</strong> {0}</div>'
+).format
+
+# Option letters indexed by position, replacing chr(65 + j) arithmetic
+_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+# Flat (section, module, question_ids) triples; sequential traversal
+# replaces nested dict lookups on every generation pass
+CachedQuestions = List[Tuple[str, int, Tuple[str, ...]]]
+
+
+# Single-entry parse cache so repeated calls within one process (or the two
+# HTML passes) reuse the same dict as long as the file is unchanged
+_QUESTIONS_CACHE: Dict[Tuple[str, int, int], Dict[Any, Any]] = {}
 
 
 def load_questions_data() -> Dict[Any, Any]:
-    """Load questions data from JSON file"""
-    with open("questions.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load questions data from the JSON file, or the CBOR file without it"""
+    # crawl.py writes questions.cbor by default and questions.json only
+    # with --json, so fall back to the CBOR artifact when the JSON is absent
+    try:
+        filename = "questions.json"
+        st = os.stat(filename)
+    except FileNotFoundError:
+        filename = "questions.cbor"
+        st = os.stat(filename)
+    key = (filename, st.st_mtime_ns, st.st_size)
+    cached = _QUESTIONS_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    with open(filename, "rb") as f:
+        if filename.endswith(".cbor"):
+            data = cbor2.load(f)
+        elif orjson is not None:
+            # Hand orjson the mapped bytes directly instead of decoding the
+            # whole file to str first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = orjson.loads(memoryview(mm))
+        else:
+            data = json.load(f)
+
+    _QUESTIONS_CACHE.clear()
+    _QUESTIONS_CACHE[key] = data
+    return data
+
+
+class PageTemplate:
+    """Drop-in replacement for string.Template specialised to template.html.
+
+    The source is split at its ${...} placeholders once and the literal
+    segments are pre-encoded to UTF-8; substitute() joins them with the
+    encoded values into the final document bytes, so the complete page
+    never exists as one huge str and the write path needs no encode pass.
+    """
+
+    _PLACEHOLDER_RE = re.compile(r"\$\{([_a-zA-Z][_a-zA-Z0-9]*)\}")
+
+    def __init__(self, source: str) -> None:
+        # Even indexes are literal segments (stored as bytes), odd indexes
+        # placeholder names
+        self._segments: List[Union[bytes, str]] = [
+            segment if i & 1 else segment.encode("utf-8")
+            for i, segment in enumerate(self._PLACEHOLDER_RE.split(source))
+        ]
+
+    def substitute(self, **values: str) -> bytes:
+        return b"".join(
+            values[segment].encode("utf-8") if i & 1 else segment  # type: ignore[index,union-attr]
+            for i, segment in enumerate(self._segments)
+        )
 
 
-def load_template() -> Template:
-    """Load the main HTML template"""
+@functools.lru_cache(maxsize=1)
+def load_template() -> PageTemplate:
+    """Load the main HTML template, caching the compiled form"""
     with open("template.html", "r", encoding="utf-8") as f:
-        return Template(f.read())
+        return PageTemplate(f.read())
+
+
+# Ordered (key, extractor) pairs tried against dict-shaped details; the
+# first key present wins, replacing the old if/elif cascades
+_DICT_ANSWER_KEYS: Tuple[Tuple[str, Callable[[Any], str]], ...] = (
+    ("correctAnswerOption", lambda v: _LETTERS[v]),
+    ("correctAnswer", lambda v: v),
+    ("correct_answer", ", ".join),
+)
+_DICT_EXPLANATION_KEYS: Tuple[Tuple[str, Callable[[Any], str]], ...] = (
+    ("rationale", lambda v: v),
+    ("explanation", lambda v: v),
+)
 
 
 def get_correct_answer(details: Union[List[Dict[str, Any]], Dict[str, Any]]) -> str:
     """Extract the correct answer from question details"""
     if isinstance(details, list) and details:
         det_0 = details[0]
-        if "answer" in det_0 and "correct" in det_0["answer"]:
-            return det_0["answer"]["correct"]
+        answer = det_0.get("answer")
+        if answer is not None and "correct" in answer:
+            return answer["correct"]
     elif isinstance(details, dict):
-        if "correctAnswerOption" in details:
-            return chr(65 + details["correctAnswerOption"])
-        elif "correctAnswer" in details:
-            return details["correctAnswer"]
-        elif "correct_answer" in details:
-            return ", ".join(details["correct_answer"])
+        for key, extract in _DICT_ANSWER_KEYS:
+            if key in details:
+                return extract(details[key])
 
     return "<em>(Refer to explanation)</em>"
 
@@ -39,80 +145,105 @@ def get_answer_explanation(details: Union[List[Dict[str, Any]], Dict[str, Any]])
     """Extract the answer explanation from question details"""
     if isinstance(details, list) and details:
         det_0 = details[0]
-        if "rationale" in det_0:
-            return det_0["rationale"]
-        elif "answer" in det_0 and "rationale" in det_0["answer"]:
-            return det_0["answer"]["rationale"]
+        rationale = det_0.get("rationale")
+        if rationale is not None:
+            return rationale
+        answer = det_0.get("answer")
+        if answer is not None and "rationale" in answer:
+            return answer["rationale"]
     elif isinstance(details, dict):
-        if "rationale" in details:
-            return details["rationale"]
-        elif "explanation" in details:
-            return details["explanation"]
+        for key, extract in _DICT_EXPLANATION_KEYS:
+            if key in details:
+                return extract(details[key])
 
     return "No explanation available."
 
 
+def _render_mcq_options(det_0: Dict[str, Any]) -> str:
+    """Render the option list for a multiple-choice answer"""
+    parts: List[str] = ['<ul class="options">']
+    option_li = OPTION_LI_FMT
+    for k, v in det_0["answer"]["choices"].items():
+        parts.append(option_li(k.upper(), v["body"]))
+    parts.append("</ul>")
+    return "".join(parts)
+
+
+# Answer markup keyed on the answer style; unknown styles (e.g. SPR
+# grid-ins, which have no options to show) render nothing, and new styles
+# only need a new entry here
+_STYLE_RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "MCQ": _render_mcq_options,
+    "Multiple Choice": _render_mcq_options,
+}
+
+
 def render_list_type_question(details: List[Dict[str, Any]]) -> str:
     """Render list-type question details"""
-    html_content = ""
+    parts: List[str] = []
     det_0: Dict[str, Any] = details[0]
 
     if "body" in det_0:
-        html_content += f'<div class="stimulus">{det_0["body"]}</div>'
+        parts.append(STIMULUS_FMT(det_0["body"]))
 
     if "stem" in det_0:
-        html_content += f'<div class="stem">{det_0["stem"]}</div>'
+        parts.append(STEM_FMT(det_0["stem"]))
 
     if "prompt" in det_0:
-        html_content += f'<div class="stem">{det_0["prompt"]}</div>'
+        parts.append(STEM_FMT(det_0["prompt"]))
 
     if "answer" in det_0:
-        if det_0["answer"]["style"] in ("MCQ", "Multiple Choice"):
-            html_content += '<ul class="options">'
-            for k, v in det_0["answer"]["choices"].items():
-                html_content += f'<li class="option"><span class="option-letter">{k.upper()}</span><span class="option-content">{v["body"]}</span></li>'
-            html_content += "</ul>"
+        renderer = _STYLE_RENDERERS.get(det_0["answer"]["style"])
+        if renderer is not None:
+            parts.append(renderer(det_0))
 
-    return html_content
+    return "".join(parts)
 
 
 def render_dict_type_question(details: Dict[str, Any]) -> str:
     """Render dictionary-type question details"""
-    html_content = ""
+    parts: List[str] = []
 
     if "stimulus" in details:
-        html_content += f'<div class="stimulus">{details["stimulus"]}</div>'
+        parts.append(STIMULUS_FMT(details["stimulus"]))
 
     if "stem" in details:
-        html_content += f'<div class="stem">{details["stem"]}</div>'
+        parts.append(STEM_FMT(details["stem"]))
 
     if "answerOptions" in details:
-        html_content += '<ul class="options">'
+        parts.append('<ul class="options">')
+        option_li = OPTION_LI_FMT
         for j, option in enumerate(details["answerOptions"]):
-            option_letter: str = chr(65 + j)
-            html_content += f'<li class="option"><span class="option-letter">{option_letter}</span><span class="option-content">{option["content"]}</span></li>'
-        html_content += "</ul>"
+            parts.append(option_li(_LETTERS[j], option["content"]))
+        parts.append("</ul>")
 
-    return html_content
+    return "".join(parts)
+
+
+# Renderer dispatch keyed on the concrete details type; anything that is
+# not a list (a dict, or None for missing details) takes the dict renderer
+DETAIL_RENDERERS: Dict[type, Callable[[Any], str]] = {
+    list: render_list_type_question,
+    dict: render_dict_type_question,
+}
+
+
+def render_details(details: Union[List[Dict[str, Any]], Dict[str, Any]]) -> str:
+    """Render question details via type-based dispatch"""
+    return DETAIL_RENDERERS.get(type(details), render_dict_type_question)(details)
 
 
 def render_question(
     question_id: str, question_num: int, questions_dict: Dict[Any, Any]
 ) -> str:
     """Render a single question"""
-    html_content = f'<div class="question"><div class="question-header">Question {question_num}</div>'
-
     details: Union[List[Dict[str, Any]], Dict[str, Any]] = questions_dict.get(
         question_id, {}
     ).get("details", {})
 
-    if isinstance(details, list):
-        html_content += render_list_type_question(details)
-    else:
-        html_content += render_dict_type_question(details)
-
-    html_content += "</div>\n"
-    return html_content
+    return "".join(
+        (QUESTION_HEADER_FMT(question_num), render_details(details), "</div>\n")
+    )
 
 
 def render_answer_key_question(
@@ -124,168 +255,342 @@ def render_answer_key_question(
         "details", {}
     )
 
-    html_content = f'<div class="question"><div class="question-header">Question {question_num}</div>'
+    return "".join(
+        (
+            QUESTION_HEADER_FMT(question_num),
+            render_details(details),
+            ANSWER_KEY_FMT(get_correct_answer(details)),
+            RATIONALE_FMT(get_answer_explanation(details)),
+            "</div>\n",
+        )
+    )
 
-    # Render the question content
-    if isinstance(details, list):
-        html_content += render_list_type_question(details)
-    else:
-        html_content += render_dict_type_question(details)
 
-    # Add correct answer
-    correct_answer = get_correct_answer(details)
-    html_content += f'<div class="answer-key"><strong>Correct Answer: {correct_answer}</strong></div>'
+def render_question_both(
+    question_id: str, question_num: int, questions_dict: Dict[Any, Any]
+) -> Tuple[str, str]:
+    """Render a question and its answer-key variant, sharing the body HTML"""
+    details: Union[List[Dict[str, Any]], Dict[str, Any]] = questions_dict.get(
+        question_id, {}
+    ).get("details", {})
+
+    header = QUESTION_HEADER_FMT(question_num)
+    body = render_details(details)
 
-    # Add explanation
-    explanation = get_answer_explanation(details)
-    html_content += (
-        f'<div class="rationale"><strong>Explanation:</strong> {explanation}</div>'
+    question_html = f"{header}{body}</div>\n"
+    answer_html = (
+        f"{header}{body}"
+        f"{ANSWER_KEY_FMT(get_correct_answer(details))}"
+        f"{RATIONALE_FMT(get_answer_explanation(details))}</div>\n"
     )
-
-    html_content += "</div>\n"
-    return html_content
+    return question_html, answer_html
 
 
 def generate_section_html(
-    section: str, module: int, questions_dict: Dict[Any, Any], question_ids: List[str]
+    section: str,
+    module: int,
+    questions_dict: Dict[Any, Any],
+    question_ids: Tuple[str, ...],
+    verbose: bool = False,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    base_pct: int = 0,
+    span_pct: int = 25,
+    log: Callable[[str], None] = print,
 ) -> str:
     """Generate HTML content for a single section using provided question IDs"""
-    html_content = f"<h2>{section.capitalize()} Module {module}</h2>\n"
+    if verbose:
+        # One batched log call for the whole section instead of one per
+        # question
+        log(
+            "\n".join(
+                f"{section.capitalize()} section module {module} question {i + 1}: {question_id}"
+                for i, question_id in enumerate(question_ids)
+            )
+        )
 
+    parts: List[str] = [f"<h2>{section.capitalize()} Module {module}</h2>\n"]
+
+    total = len(question_ids)
     for i, question_id in enumerate(question_ids):
-        print(
-            f"{section.capitalize()} section module {module} question {i + 1}: {question_id}"
-        )
-        html_content += render_question(question_id, i + 1, questions_dict)
+        if progress_callback is not None and i % 25 == 0:
+            progress_callback(
+                base_pct + i * span_pct // total, f"{section} m{module} q{i + 1}"
+            )
+        parts.append(render_question(question_id, i + 1, questions_dict))
 
-    return html_content
+    return "".join(parts)
 
 
 def generate_answer_key_section_html(
-    section: str, module: int, questions_dict: Dict[Any, Any], question_ids: List[str]
+    section: str,
+    module: int,
+    questions_dict: Dict[Any, Any],
+    question_ids: Tuple[str, ...],
+    verbose: bool = False,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    base_pct: int = 0,
+    span_pct: int = 25,
+    log: Callable[[str], None] = print,
 ) -> str:
     """Generate answer key HTML content for a single section using provided question IDs"""
-    html_content = f"<h2>{section.capitalize()} Module {module} - Answer Key</h2>\n"
+    if verbose:
+        log(
+            "\n".join(
+                f"Answer key: {section.capitalize()} section module {module} question {i + 1}: {question_id}"
+                for i, question_id in enumerate(question_ids)
+            )
+        )
+
+    parts: List[str] = [f"<h2>{section.capitalize()} Module {module} - Answer Key</h2>\n"]
 
+    total = len(question_ids)
     for i, question_id in enumerate(question_ids):
-        print(
-            f"Answer key: {section.capitalize()} section module {module} question {i + 1}: {question_id}"
-        )
-        html_content += render_answer_key_question(question_id, i + 1, questions_dict)
+        if progress_callback is not None and i % 25 == 0:
+            progress_callback(
+                base_pct + i * span_pct // total, f"{section} m{module} q{i + 1}"
+            )
+        parts.append(render_answer_key_question(question_id, i + 1, questions_dict))
 
-    return html_content
+    return "".join(parts)
 
 
 def generate_questions_and_keys(
     questions_dict: Dict[Any, Any],
-) -> Dict[str, Dict[int, List[str]]]:
+) -> CachedQuestions:
     """Generate and cache question IDs for each section and module"""
-    cached_questions: Dict[str, Dict[int, List[str]]] = {}
-
-    for section in ["reading", "math"]:
-        cached_questions[section] = {}
-        for module in [1, 2]:
-            question_ids = make_module(section, module)
-            cached_questions[section][module] = question_ids
-
-    return cached_questions
+    return [
+        (section, module, tuple(make_module(section, module)))
+        for section in ("reading", "math")
+        for module in (1, 2)
+    ]
 
 
 def generate_html_content(
     questions_dict: Dict[Any, Any],
-    cached_questions: Dict[str, Dict[int, List[str]]],
-) -> str:
+    cached_questions: CachedQuestions,
+    verbose: bool = False,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    log: Callable[[str], None] = print,
+) -> bytes:
     """Generate complete HTML content for questions only"""
     template = load_template()
 
-    content = ""
-    for section in ["reading", "math"]:
-        for module in [1, 2]:
-            question_ids = cached_questions[section][module]
-            content += generate_section_html(
-                section, module, questions_dict, question_ids
+    span_pct = 100 // len(cached_questions) if cached_questions else 100
+    content_parts: List[str] = []
+    for idx, (section, module, question_ids) in enumerate(cached_questions):
+        content_parts.append(
+            generate_section_html(
+                section,
+                module,
+                questions_dict,
+                question_ids,
+                verbose,
+                progress_callback,
+                base_pct=idx * span_pct,
+                span_pct=span_pct,
+                log=log,
             )
+        )
 
     html_content = template.substitute(
         document_title="SAT Questions",
-        content=content,
+        content="".join(content_parts),
     )
 
     return html_content
 
 
+def render_module_both(
+    section: str,
+    module: int,
+    questions_subset: Dict[Any, Any],
+    question_ids: Tuple[str, ...],
+) -> Tuple[str, str]:
+    """Render one module's questions and answer-key HTML.
+
+    Top-level so ProcessPoolExecutor workers can pickle and call it; the
+    subset dict keeps the per-task payload to just that module's questions.
+    """
+    q_parts: List[str] = [f"<h2>{section.capitalize()} Module {module}</h2>\n"]
+    a_parts: List[str] = [
+        f"<h2>{section.capitalize()} Module {module} - Answer Key</h2>\n"
+    ]
+    for i, question_id in enumerate(question_ids):
+        question_html, answer_html = render_question_both(
+            question_id, i + 1, questions_subset
+        )
+        q_parts.append(question_html)
+        a_parts.append(answer_html)
+    return "".join(q_parts), "".join(a_parts)
+
+
+def generate_both_html_contents(
+    questions_dict: Dict[Any, Any],
+    cached_questions: CachedQuestions,
+    verbose: bool = False,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    log: Callable[[str], None] = print,
+) -> Tuple[bytes, bytes]:
+    """Generate questions and answer-key HTML in a single traversal.
+
+    Each question's body is rendered once and shared between the two
+    outputs, and the four independent (section, module) pairs render in
+    parallel worker processes.
+    """
+    template = load_template()
+
+    sections: List[str] = []
+    modules: List[int] = []
+    subsets: List[Dict[Any, Any]] = []
+    id_lists: List[Tuple[str, ...]] = []
+    for section, module, question_ids in cached_questions:
+        if verbose:
+            log(
+                "\n".join(
+                    f"{section.capitalize()} section module {module} question {i + 1}: {question_id}"
+                    for i, question_id in enumerate(question_ids)
+                )
+            )
+        sections.append(section)
+        modules.append(module)
+        subsets.append(
+            {
+                question_id: questions_dict.get(question_id, {})
+                for question_id in question_ids
+            }
+        )
+        id_lists.append(question_ids)
+
+    q_parts: List[str] = []
+    a_parts: List[str] = [
+        generate_answer_summary_table(questions_dict, cached_questions)
+    ]
+    span_pct = 100 // len(sections) if sections else 100
+    with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
+        # executor.map preserves module order; modules render in worker
+        # processes, so progress is reported as each one completes
+        for idx, (question_html, answer_html) in enumerate(
+            executor.map(render_module_both, sections, modules, subsets, id_lists)
+        ):
+            if progress_callback is not None:
+                progress_callback(
+                    (idx + 1) * span_pct, f"{sections[idx]} m{modules[idx]} done"
+                )
+            q_parts.append(question_html)
+            a_parts.append(answer_html)
+
+    return (
+        template.substitute(
+            document_title="SAT Questions",
+            content="".join(q_parts),
+        ),
+        template.substitute(
+            document_title="SAT Questions - Answer Key & Explanations",
+            content="".join(a_parts),
+        ),
+    )
+
+
 def generate_answer_summary_table(
     questions_dict: Dict[Any, Any],
-    cached_questions: Dict[str, Dict[int, List[str]]],
+    cached_questions: CachedQuestions,
 ) -> str:
     """Generate a summary table of all correct answers"""
-    html_content = '<div class="answer-summary">\n'
-
-    for section in ["reading", "math"]:
-        html_content += f'<div class="section-summary"><h3>{section.capitalize()} Section</h3>\n'
-
-        for module in [1, 2]:
-            question_ids = cached_questions[section][module]
-            html_content += f'<div class="module-summary"><h4>Module {module}</h4>\n'
-            html_content += '<table class="answer-summary-table">\n'
-            html_content += '<thead>\n'
-            html_content += '<tr>\n'
-            html_content += '<th class="question-number-header">No.</th>\n'
-            html_content += '<th class="question-id-header">ID</th>\n'
-            html_content += '<th class="answer-header">Answer</th>\n'
-            html_content += '</tr>\n'
-            html_content += '</thead>\n'
-            html_content += '<tbody>\n'
-
-            for i, question_id in enumerate(question_ids):
-                details = questions_dict.get(question_id, {}).get("details", {})
-                correct_answer = get_correct_answer(details)
-                html_content += '<tr class="answer-row">\n'
-                html_content += f'<td class="question-number">{i + 1}</td>\n'
-                html_content += f'<td class="question-id">{question_id}</td>\n'
-                html_content += f'<td class="correct-answer">{correct_answer}</td>\n'
-                html_content += '</tr>\n'
-
-            html_content += '</tbody>\n'
-            html_content += '</table>\n'
-            html_content += '</div>\n'  # Close module-summary
-
-        html_content += '</div>\n'  # Close section-summary
-
-    html_content += '</div>\n'  # Close answer-summary
-    html_content += '<div style="page-break-after: always;"></div>\n'
-    return html_content
+    parts: List[str] = ['<div class="answer-summary">\n']
+
+    previous_section: Optional[str] = None
+    for section, module, question_ids in cached_questions:
+        if section != previous_section:
+            if previous_section is not None:
+                parts.append('</div>\n')  # Close section-summary
+            parts.append(
+                f'<div class="section-summary"><h3>{section.capitalize()} Section</h3>\n'
+            )
+            previous_section = section
+
+        parts.extend(
+            (
+                f'<div class="module-summary"><h4>Module {module}</h4>\n',
+                '<table class="answer-summary-table">\n',
+                '<thead>\n',
+                '<tr>\n',
+                '<th class="question-number-header">No.</th>\n',
+                '<th class="question-id-header">ID</th>\n',
+                '<th class="answer-header">Answer</th>\n',
+                '</tr>\n',
+                '</thead>\n',
+                '<tbody>\n',
+            )
+        )
+
+        for i, question_id in enumerate(question_ids):
+            details = questions_dict.get(question_id, {}).get("details", {})
+            correct_answer = get_correct_answer(details)
+            parts.extend(
+                (
+                    '<tr class="answer-row">\n',
+                    f'<td class="question-number">{i + 1}</td>\n',
+                    f'<td class="question-id">{question_id}</td>\n',
+                    f'<td class="correct-answer">{correct_answer}</td>\n',
+                    '</tr>\n',
+                )
+            )
+
+        parts.extend(('</tbody>\n', '</table>\n', '</div>\n'))  # Close module-summary
+
+    if previous_section is not None:
+        parts.append('</div>\n')  # Close section-summary
+
+    parts.append('</div>\n')  # Close answer-summary
+    parts.append('<div style="page-break-after: always;"></div>\n')
+    return "".join(parts)
 
 
 def generate_answer_key_html_content(
     questions_dict: Dict[Any, Any],
-    cached_questions: Dict[str, Dict[int, List[str]]],
-) -> str:
+    cached_questions: CachedQuestions,
+    verbose: bool = False,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    log: Callable[[str], None] = print,
+) -> bytes:
     """Generate complete HTML content for answer key with explanations using cached question IDs"""
     template = load_template()
 
     # Start with answer summary table
-    content = generate_answer_summary_table(questions_dict, cached_questions)
+    content_parts: List[str] = [
+        generate_answer_summary_table(questions_dict, cached_questions)
+    ]
 
     # Add detailed answers and explanations
-    for section in ["reading", "math"]:
-        for module in [1, 2]:
-            question_ids = cached_questions[section][module]
-            content += generate_answer_key_section_html(
-                section, module, questions_dict, question_ids
+    span_pct = 100 // len(cached_questions) if cached_questions else 100
+    for idx, (section, module, question_ids) in enumerate(cached_questions):
+        content_parts.append(
+            generate_answer_key_section_html(
+                section,
+                module,
+                questions_dict,
+                question_ids,
+                verbose,
+                progress_callback,
+                base_pct=idx * span_pct,
+                span_pct=span_pct,
+                log=log,
             )
+        )
 
     html_content = template.substitute(
         document_title="SAT Questions - Answer Key & Explanations",
-        content=content,
+        content="".join(content_parts),
     )
 
     return html_content
 
 
-def write_html_file(html_content: str, filename: str = "questions.html") -> None:
+def write_html_file(html_content: bytes, filename: str = "questions.html") -> None:
     """Write HTML content to file"""
-    with open(filename, "w", encoding="utf-8") as html_file:
+    # The template already produced UTF-8 bytes; write them unbuffered in
+    # one call, skipping the TextIOWrapper encode/newline-translation layer
+    with open(filename, "wb", buffering=0) as html_file:
         html_file.write(html_content)
 
 
@@ -293,9 +598,17 @@ def main(
     output: str = "questions",
     answers_only: bool = False,
     no_answers: bool = False,
-    questions: Optional[Dict[str, Dict[int, List[str]]]] = None,
+    questions: Optional[CachedQuestions] = None,
+    verbose: bool = False,
+    log: Callable[[str], None] = print,
+    progress_callback: Optional[Callable[[int, str], None]] = None,
 ) -> None:
-    """Main function to generate HTML file"""
+    """Main function to generate HTML file.
+
+    Embedders can pass ``log`` to receive status lines directly instead of
+    capturing stdout, and ``progress_callback`` to receive
+    (percent, message) updates from within the render loops.
+    """
 
     # Generate filenames
     questions_html_filename = f"{output}.html"
@@ -310,31 +623,44 @@ def main(
     else:
         cached_questions = questions
 
-    if not answers_only:
+    if not answers_only and not no_answers:
+        # Both outputs requested: render each question once and share the
+        # body between the two documents
+        log(f"Generating questions: {questions_html_filename}")
+        log(f"Generating answer key: {answers_html_filename}")
+
+        questions_html_content, answers_html_content = generate_both_html_contents(
+            questions_dict, cached_questions, verbose, progress_callback, log
+        )
+        write_html_file(questions_html_content, questions_html_filename)
+        write_html_file(answers_html_content, answers_html_filename)
+
+        log("Questions HTML generated successfully!")
+        log("Answer key HTML generated successfully!")
+    elif not answers_only:
         # Generate questions HTML
-        print(
+        log(
             f"Generating questions: {questions_html_filename}"
         )
 
         questions_html_content = generate_html_content(
-            questions_dict, cached_questions
+            questions_dict, cached_questions, verbose, progress_callback, log
         )
         write_html_file(questions_html_content, questions_html_filename)
 
-        print("Questions HTML generated successfully!")
-
-    if not no_answers:
+        log("Questions HTML generated successfully!")
+    elif not no_answers:
         # Generate answer key HTML using the same question IDs
-        print(f"Generating answer key: {answers_html_filename}")
+        log(f"Generating answer key: {answers_html_filename}")
 
         answers_html_content = generate_answer_key_html_content(
-            questions_dict, cached_questions
+            questions_dict, cached_questions, verbose, progress_callback, log
         )
         write_html_file(answers_html_content, answers_html_filename)
 
-        print("Answer key HTML generated successfully!")
+        log("Answer key HTML generated successfully!")
 
-    print("All files generated successfully!")
+    log("All files generated successfully!")
 
 
 def cli_main() -> None:
@@ -354,6 +680,11 @@ def cli_main() -> None:
         action="store_true",
         help="Generate only the questions HTML (no answer key)",
     )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print each selected question id while generating",
+    )
 
     args = parser.parse_args()
 
@@ -362,6 +693,7 @@ def cli_main() -> None:
         output=args.output,
         answers_only=args.answers_only,
         no_answers=args.no_answers,
+        verbose=args.verbose,
     )
 
 
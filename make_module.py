@@ -1,9 +1,39 @@
-from collections import defaultdict
+import functools
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Tuple
 
+# Module configurations; built once instead of on every lookup
+_CONFIGS: Dict[Tuple[str, int], Dict[str, Any]] = {
+    ("reading", 1): {
+        "total_questions": 27,
+        "difficulty_ratios": {"E": 11, "M": 11, "H": 5},
+        "max_skill_count": 3
+    },
+    ("reading", 2): {
+        "total_questions": 27,
+        "difficulty_ratios": {"E": 7, "M": 10, "H": 10},
+        "max_skill_count": 3
+    },
+    ("math", 1): {
+        "total_questions": 22,
+        "difficulty_ratios": {"E": 9, "M": 9, "H": 4},
+        "max_skill_count": 1
+    },
+    ("math", 2): {
+        "total_questions": 22,
+        "difficulty_ratios": {"E": 4, "M": 9, "H": 9},
+        "max_skill_count": 1
+    }
+}
+
+# Fixed difficulty order used to encode difficulties as small integers
+_DIFFICULTIES: Tuple[str, ...] = ("E", "M", "H")
+
+
+@functools.lru_cache(maxsize=1)
 def load_csv_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Load CSV data files"""
+    """Load CSV data files, caching the parsed frames across calls"""
     reading: pd.DataFrame = pd.read_csv("reading.csv", encoding="utf-8")
     math: pd.DataFrame = pd.read_csv("math.csv", encoding="utf-8")
     return reading, math
@@ -11,29 +41,25 @@ def load_csv_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
 
 def get_module_config(section: str, module: int) -> Dict[str, Any]:
     """Get module configuration"""
-    configs: Dict[Tuple[str, int], Dict[str, Any]] = {
-        ("reading", 1): {
-            "total_questions": 27,
-            "difficulty_ratios": {"E": 11, "M": 11, "H": 5},
-            "max_skill_count": 3
-        },
-        ("reading", 2): {
-            "total_questions": 27,
-            "difficulty_ratios": {"E": 7, "M": 10, "H": 10},
-            "max_skill_count": 3
-        },
-        ("math", 1): {
-            "total_questions": 22,
-            "difficulty_ratios": {"E": 9, "M": 9, "H": 4},
-            "max_skill_count": 1
-        },
-        ("math", 2): {
-            "total_questions": 22,
-            "difficulty_ratios": {"E": 4, "M": 9, "H": 9},
-            "max_skill_count": 1
-        }
-    }
-    return configs[(section, module)]
+    return _CONFIGS[(section, module)]
+
+
+def extract_columns(df: pd.DataFrame) -> Tuple[np.ndarray, List[int], List[int], int]:
+    """Pre-extract ids plus integer difficulty/skill codes from a frame"""
+    ids = df.iloc[:, 0].to_numpy()
+    diff_codes = pd.Categorical(
+        df.iloc[:, 1], categories=list(_DIFFICULTIES)
+    ).codes
+    # Categorical encodes anything outside E/M/H (including NaN) as -1,
+    # which would silently index the counters from the end; fail instead
+    if (diff_codes < 0).any():
+        bad = df.iloc[:, 1].to_numpy()[diff_codes < 0]
+        raise ValueError(f"Difficulty must be one of E, M or H, got {bad[0]!r}")
+    # use_na_sentinel=False gives a missing skill its own code instead of
+    # -1, which would alias the last skill's counter; the baseline counted
+    # NaN as a skill of its own, so keep that behaviour
+    skill_codes, skill_names = pd.factorize(df.iloc[:, 3], use_na_sentinel=False)
+    return ids, diff_codes.tolist(), skill_codes.tolist(), len(skill_names)
 
 
 def validate_inputs(section: str, module: int) -> None:
@@ -45,35 +71,44 @@ def validate_inputs(section: str, module: int) -> None:
 
 
 def select_math_questions_by_skill(
-    df: pd.DataFrame,
-    difficulty_ratios: Dict[str, int],
-    draw_counts: defaultdict[str, int]
+    ids: np.ndarray,
+    diff_codes: List[int],
+    skill_codes: List[int],
+    difficulty_limits: List[int],
+    diff_counts: List[int],
+    skill_counts: List[int]
 ) -> List[str]:
     """Select questions for each skill in math module"""
+    unique_skills_count: int = len(skill_counts)
     q_list: List[str] = []
-    unique_skills_count: int = len(df["Skill"].unique())
 
+    # Scan a random permutation of the rows instead of re-sampling
+    # one-row DataFrames until the constraints happen to be met
     while len(q_list) < unique_skills_count:
-        temp: pd.DataFrame = df.sample(n=1)
-        difficulty: str = temp.iloc[0, 1]
-        skill: str = temp.iloc[0, 3]
-        question_id: str = temp.iloc[0, 0]
-
-        if (
-            draw_counts[difficulty] <= difficulty_ratios[difficulty]
-            and draw_counts[skill] < 1
-        ):
-            draw_counts[difficulty] += 1
-            draw_counts[skill] += 1
-            q_list.append(question_id)
+        for idx in np.random.permutation(len(ids)).tolist():
+            if len(q_list) >= unique_skills_count:
+                break
+            difficulty: int = diff_codes[idx]
+            skill: int = skill_codes[idx]
+
+            if (
+                diff_counts[difficulty] <= difficulty_limits[difficulty]
+                and skill_counts[skill] < 1
+            ):
+                diff_counts[difficulty] += 1
+                skill_counts[skill] += 1
+                q_list.append(ids[idx])
 
     return q_list
 
 
 def select_additional_math_questions(
-    df: pd.DataFrame,
-    difficulty_ratios: Dict[str, int],
-    draw_counts: defaultdict[str, int],
+    ids: np.ndarray,
+    diff_codes: List[int],
+    skill_codes: List[int],
+    difficulty_limits: List[int],
+    diff_counts: List[int],
+    skill_counts: List[int],
     current_count: int,
     target_count: int
 ) -> List[str]:
@@ -81,15 +116,15 @@ def select_additional_math_questions(
     q_list: List[str] = []
 
     while current_count + len(q_list) < target_count:
-        temp: pd.DataFrame = df.sample(n=1)
-        difficulty: str = temp.iloc[0, 1]
-        skill: str = temp.iloc[0, 3]
-        question_id: str = temp.iloc[0, 0]
+        for idx in np.random.permutation(len(ids)).tolist():
+            if current_count + len(q_list) >= target_count:
+                break
+            difficulty: int = diff_codes[idx]
 
-        if draw_counts[difficulty] <= difficulty_ratios[difficulty]:
-            draw_counts[difficulty] += 1
-            draw_counts[skill] += 1
-            q_list.append(question_id)
+            if diff_counts[difficulty] <= difficulty_limits[difficulty]:
+                diff_counts[difficulty] += 1
+                skill_counts[skill_codes[idx]] += 1
+                q_list.append(ids[idx])
 
     return q_list
 
@@ -101,38 +136,49 @@ def select_reading_questions(
     max_skill_count: int
 ) -> List[str]:
     """Select reading questions"""
-    draw_counts: defaultdict[str, int] = defaultdict(int)
+    ids, diff_codes, skill_codes, n_skills = extract_columns(df)
+    difficulty_limits: List[int] = [difficulty_ratios[d] for d in _DIFFICULTIES]
+    diff_counts: List[int] = [0, 0, 0]
+    skill_counts: List[int] = [0] * n_skills
     q_list: List[str] = []
 
     while len(q_list) < target_count:
-        temp: pd.DataFrame = df.sample(n=1)
-        difficulty: str = temp.iloc[0, 1]
-        skill: str = temp.iloc[0, 3]
-        question_id: str = temp.iloc[0, 0]
-
-        if (
-            draw_counts[difficulty] <= difficulty_ratios[difficulty]
-            and draw_counts[skill] < max_skill_count
-        ):
-            draw_counts[difficulty] += 1
-            draw_counts[skill] += 1
-            q_list.append(question_id)
+        for idx in np.random.permutation(len(ids)).tolist():
+            if len(q_list) >= target_count:
+                break
+            difficulty: int = diff_codes[idx]
+            skill: int = skill_codes[idx]
+
+            if (
+                diff_counts[difficulty] <= difficulty_limits[difficulty]
+                and skill_counts[skill] < max_skill_count
+            ):
+                diff_counts[difficulty] += 1
+                skill_counts[skill] += 1
+                q_list.append(ids[idx])
 
     return q_list
 
 
 def select_math_questions(df: pd.DataFrame, config: Dict[str, Any]) -> List[str]:
     """Select math questions"""
-    difficulty_ratios: Dict[str, int] = config["difficulty_ratios"]
+    ids, diff_codes, skill_codes, n_skills = extract_columns(df)
+    difficulty_limits: List[int] = [
+        config["difficulty_ratios"][d] for d in _DIFFICULTIES
+    ]
     target_count: int = config["total_questions"]
-    draw_counts: defaultdict[str, int] = defaultdict(int)
+    diff_counts: List[int] = [0, 0, 0]
+    skill_counts: List[int] = [0] * n_skills
 
     # First select one question for each skill
-    q_list: List[str] = select_math_questions_by_skill(df, difficulty_ratios, draw_counts)
+    q_list: List[str] = select_math_questions_by_skill(
+        ids, diff_codes, skill_codes, difficulty_limits, diff_counts, skill_counts
+    )
 
     # Select remaining questions
     additional_questions: List[str] = select_additional_math_questions(
-        df, difficulty_ratios, draw_counts, len(q_list), target_count
+        ids, diff_codes, skill_codes, difficulty_limits, diff_counts,
+        skill_counts, len(q_list), target_count
     )
 
     q_list.extend(additional_questions)
@@ -2,8 +2,12 @@ with import <nixpkgs> { };
 mkShell {
   nativeBuildInputs = [
     python313
-    python313Packages.requests
-    python313Packages.types-requests
+    python313Packages.httpx
+    python313Packages.h2
+    python313Packages.brotli
+    python313Packages.orjson
+    python313Packages.cbor2
+    python313Packages.zstandard
     python313Packages.tqdm
     python313Packages.types-tqdm
     python313Packages.pandas